@@ -17,15 +17,15 @@ SELECT
     ROUND(latest.market_cap / 1000000000, 2) as market_cap_billions
 FROM cryptocurrencies c
 JOIN (
-    SELECT crypto_id, price_usd, market_cap
+    SELECT crypto_pk, price_usd, market_cap
     FROM price_history
     WHERE date = (SELECT MAX(date) FROM price_history)
-) latest ON c.crypto_id = latest.crypto_id
+) latest ON c.crypto_pk = latest.crypto_pk
 JOIN (
-    SELECT crypto_id, price_usd
+    SELECT crypto_pk, price_usd
     FROM price_history
     WHERE date = (SELECT date(MAX(date), '-30 days') FROM price_history)
-) first ON c.crypto_id = first.crypto_id
+) first ON c.crypto_pk = first.crypto_pk
 ORDER BY performance_30d_pct DESC
 LIMIT 10;
 
@@ -47,7 +47,7 @@ SELECT
         ELSE 'Peu volatile'
     END as risk_category
 FROM cryptocurrencies c
-JOIN metrics m ON c.crypto_id = m.crypto_id
+JOIN metrics m ON c.crypto_pk = m.crypto_pk
 WHERE m.date >= date('now', '-90 days')
 GROUP BY c.symbol, c.name
 ORDER BY avg_volatility_30d DESC;
@@ -65,7 +65,7 @@ SELECT
     ROUND(MIN(ph.total_volume) / 1000000000, 2) as min_volume_billions,
     COUNT(*) as days_tracked
 FROM cryptocurrencies c
-JOIN price_history ph ON c.crypto_id = ph.crypto_id
+JOIN price_history ph ON c.crypto_pk = ph.crypto_pk
 WHERE ph.date >= date('now', '-30 days')
 GROUP BY c.symbol, c.name
 ORDER BY avg_volume_30d_billions DESC
@@ -83,7 +83,7 @@ WITH latest_marketcap AS (
         ph.market_cap,
         SUM(ph.market_cap) OVER () as total_market_cap
     FROM cryptocurrencies c
-    JOIN price_history ph ON c.crypto_id = ph.crypto_id
+    JOIN price_history ph ON c.crypto_pk = ph.crypto_pk
     WHERE ph.date = (SELECT MAX(date) FROM price_history)
 )
 SELECT 
@@ -110,7 +110,7 @@ SELECT
         1
     ) as positive_days_pct
 FROM cryptocurrencies c
-JOIN metrics m ON c.crypto_id = m.crypto_id
+JOIN metrics m ON c.crypto_pk = m.crypto_pk
 WHERE m.date >= date('now', '-90 days')
 GROUP BY c.symbol
 ORDER BY avg_daily_return_pct DESC;
@@ -131,7 +131,7 @@ SELECT
         2
     ) as weekly_range_pct
 FROM cryptocurrencies c
-JOIN price_history ph ON c.crypto_id = ph.crypto_id
+JOIN price_history ph ON c.crypto_pk = ph.crypto_pk
 WHERE ph.date >= date('now', '-60 days')
 GROUP BY c.symbol, strftime('%Y-W%W', ph.date)
 ORDER BY week DESC, c.symbol;
@@ -148,7 +148,7 @@ WITH performance_metrics AS (
         AVG(m.daily_return) as avg_return,
         AVG(m.volatility_30d) as avg_volatility
     FROM cryptocurrencies c
-    JOIN metrics m ON c.crypto_id = m.crypto_id
+    JOIN metrics m ON c.crypto_pk = m.crypto_pk
     WHERE m.date >= date('now', '-90 days')
     GROUP BY c.symbol, c.name
 )
@@ -174,17 +174,17 @@ ORDER BY risk_return_ratio DESC;
 -- ============================================
 -- Prix actuel vs moyennes mobiles 7j et 30j
 WITH current_prices AS (
-    SELECT crypto_id, price_usd as current_price
+    SELECT crypto_pk, price_usd as current_price
     FROM price_history
     WHERE date = (SELECT MAX(date) FROM price_history)
 ),
 moving_averages AS (
     SELECT 
-        crypto_id,
+        crypto_pk,
         AVG(CASE WHEN date >= date('now', '-7 days') THEN price_usd END) as ma_7d,
         AVG(CASE WHEN date >= date('now', '-30 days') THEN price_usd END) as ma_30d
     FROM price_history
-    GROUP BY crypto_id
+    GROUP BY crypto_pk
 )
 SELECT 
     c.symbol,
@@ -200,8 +200,8 @@ SELECT
         ELSE 'Neutre'
     END as trend_signal
 FROM cryptocurrencies c
-JOIN current_prices cp ON c.crypto_id = cp.crypto_id
-JOIN moving_averages ma ON c.crypto_id = ma.crypto_id
+JOIN current_prices cp ON c.crypto_pk = cp.crypto_pk
+JOIN moving_averages ma ON c.crypto_pk = ma.crypto_pk
 ORDER BY c.symbol;
 
 
@@ -210,13 +210,13 @@ ORDER BY c.symbol;
 -- ============================================
 -- Vue d'ensemble du marché crypto
 SELECT 
-    COUNT(DISTINCT c.crypto_id) as total_cryptos_tracked,
+    COUNT(DISTINCT c.crypto_pk) as total_cryptos_tracked,
     ROUND(SUM(ph.market_cap) / 1000000000, 2) as total_market_cap_billions,
     ROUND(SUM(ph.total_volume) / 1000000000, 2) as total_volume_24h_billions,
     ROUND(AVG(ph.price_usd), 2) as avg_price,
     date(ph.date) as snapshot_date
 FROM price_history ph
-JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
+JOIN cryptocurrencies c ON ph.crypto_pk = c.crypto_pk
 WHERE ph.date = (SELECT MAX(date) FROM price_history)
 GROUP BY date(ph.date);
 
@@ -226,12 +226,12 @@ GROUP BY date(ph.date);
 -- ============================================
 -- Plus grandes variations sur les dernières 24h
 WITH yesterday AS (
-    SELECT crypto_id, price_usd as price_yesterday
+    SELECT crypto_pk, price_usd as price_yesterday
     FROM price_history
     WHERE date = (SELECT date(MAX(date), '-1 day') FROM price_history)
 ),
 today AS (
-    SELECT crypto_id, price_usd as price_today
+    SELECT crypto_pk, price_usd as price_today
     FROM price_history
     WHERE date = (SELECT MAX(date) FROM price_history)
 )
@@ -249,6 +249,6 @@ SELECT
         ELSE '💥 Strong Down'
     END as movement_indicator
 FROM cryptocurrencies c
-JOIN yesterday y ON c.crypto_id = y.crypto_id
-JOIN today t ON c.crypto_id = t.crypto_id
+JOIN yesterday y ON c.crypto_pk = y.crypto_pk
+JOIN today t ON c.crypto_pk = t.crypto_pk
 ORDER BY change_24h_pct DESC;
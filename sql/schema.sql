@@ -2,8 +2,11 @@
 -- SQLite database schema
 
 -- Table des cryptomonnaies
+-- crypto_pk : clé entière compacte utilisée par les autres tables
+-- crypto_id : identifiant CoinGecko (ex: "bitcoin")
 CREATE TABLE IF NOT EXISTS cryptocurrencies (
-    crypto_id TEXT PRIMARY KEY,
+    crypto_pk INTEGER PRIMARY KEY,
+    crypto_id TEXT NOT NULL UNIQUE,
     symbol TEXT NOT NULL,
     name TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -12,20 +15,20 @@ CREATE TABLE IF NOT EXISTS cryptocurrencies (
 -- Table des prix historiques
 CREATE TABLE IF NOT EXISTS price_history (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    crypto_id TEXT NOT NULL,
+    crypto_pk INTEGER NOT NULL,
     date DATE NOT NULL,
     price_usd REAL NOT NULL,
     market_cap REAL,
     total_volume REAL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (crypto_id) REFERENCES cryptocurrencies(crypto_id),
-    UNIQUE(crypto_id, date)
+    FOREIGN KEY (crypto_pk) REFERENCES cryptocurrencies(crypto_pk),
+    UNIQUE(crypto_pk, date)
 );
 
 -- Table des métriques calculées (volatilité, rendements, etc.)
 CREATE TABLE IF NOT EXISTS metrics (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    crypto_id TEXT NOT NULL,
+    crypto_pk INTEGER NOT NULL,
     date DATE NOT NULL,
     daily_return REAL,
     volatility_7d REAL,
@@ -33,14 +36,18 @@ CREATE TABLE IF NOT EXISTS metrics (
     volume_change_24h REAL,
     market_cap_rank INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (crypto_id) REFERENCES cryptocurrencies(crypto_id),
-    UNIQUE(crypto_id, date)
+    FOREIGN KEY (crypto_pk) REFERENCES cryptocurrencies(crypto_pk),
+    UNIQUE(crypto_pk, date)
 );
 
 -- Index pour améliorer les performances des requêtes
-CREATE INDEX IF NOT EXISTS idx_price_crypto_date ON price_history(crypto_id, date);
+CREATE INDEX IF NOT EXISTS idx_price_crypto_date ON price_history(crypto_pk, date);
 CREATE INDEX IF NOT EXISTS idx_price_date ON price_history(date);
-CREATE INDEX IF NOT EXISTS idx_metrics_crypto_date ON metrics(crypto_id, date);
+CREATE INDEX IF NOT EXISTS idx_metrics_crypto_date ON metrics(crypto_pk, date);
+-- Index couvrant pour "dernier jour, trié par market cap" (lecture d'index seule)
+CREATE INDEX IF NOT EXISTS idx_ph_date_mcap ON price_history(date, market_cap DESC, crypto_pk, price_usd);
+-- Index partiel couvrant pour les moyennes de volatilité
+CREATE INDEX IF NOT EXISTS idx_metrics_v30 ON metrics(crypto_pk, volatility_30d) WHERE volatility_30d IS NOT NULL;
 
 -- Vue pour faciliter les analyses : prix avec symboles
 CREATE VIEW IF NOT EXISTS vw_price_analysis AS
@@ -55,8 +62,8 @@ SELECT
     m.volatility_30d,
     m.market_cap_rank
 FROM price_history ph
-JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
-LEFT JOIN metrics m ON ph.crypto_id = m.crypto_id AND ph.date = m.date
+JOIN cryptocurrencies c ON ph.crypto_pk = c.crypto_pk
+LEFT JOIN metrics m ON ph.crypto_pk = m.crypto_pk AND ph.date = m.date
 ORDER BY ph.date DESC, c.symbol;
 
 -- Vue pour les performances mensuelles
@@ -71,6 +78,6 @@ SELECT
     (MAX(ph.price_usd) - MIN(ph.price_usd)) / MIN(ph.price_usd) * 100 as monthly_range_pct,
     SUM(ph.total_volume) as total_volume_month
 FROM price_history ph
-JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
+JOIN cryptocurrencies c ON ph.crypto_pk = c.crypto_pk
 GROUP BY c.symbol, c.name, strftime('%Y-%m', ph.date)
 ORDER BY month DESC, c.symbol;
@@ -0,0 +1,177 @@
+"""
+Noyaux numériques compilés avec Numba pour le calcul des métriques
+Repli en Python pur (même résultat, plus lent) si Numba n'est pas installé
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Décorateur neutre utilisé quand Numba est absent"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# fastmath sans 'nnan'/'ninf' : les tests de NaN doivent rester valides
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def group_bounds(codes):
+    """
+    Bornes [début, fin) de chaque groupe dans un tableau de codes trié
+
+    Args:
+        codes (np.ndarray): Codes entiers de groupe (0..k-1), croissants
+
+    Returns:
+        tuple: (starts, ends) en tableaux int64
+    """
+    groups = np.arange(codes.max() + 1 if len(codes) else 0)
+    starts = np.searchsorted(codes, groups, side="left")
+    ends = np.searchsorted(codes, groups, side="right")
+    return starts, ends
+
+
+@njit(cache=True, fastmath=FASTMATH)
+def rolling_std_into(x, w, out):
+    """
+    Écart-type mobile (ddof=1) sur une fenêtre de `w` valeurs, écrit dans `out`
+
+    Moyenne et somme des carrés des écarts mises à jour à l'ajout et au retrait
+    de chaque valeur (Welford) : O(N) au lieu de O(N·W). Comme pandas avec
+    min_periods=w, le résultat vaut NaN tant que la fenêtre ne contient pas
+    `w` valeurs non-NaN, et vaut NaN pour toute fenêtre contenant un infini
+    (rendement après un prix nul). Les infinis sont comptés à part pour ne
+    pas empoisonner les accumulateurs, qui restent en float64 même pour une
+    entrée float32 (pas de perte par annulation).
+
+    Args:
+        x (np.ndarray): Série float32 ou float64
+        w (int): Taille de la fenêtre
+        out (np.ndarray): Tableau de sortie préalloué, même longueur que x
+    """
+    nobs = 0
+    ninf = 0
+    mean = 0.0
+    ssqdm = 0.0
+
+    for i in range(len(x)):
+        # Ajout de la nouvelle valeur
+        val = np.float64(x[i])
+        if np.isinf(val):
+            ninf += 1
+        elif not np.isnan(val):
+            nobs += 1
+            delta = val - mean
+            mean += delta / nobs
+            ssqdm += delta * (val - mean)
+
+        # Retrait de la valeur qui sort de la fenêtre
+        if i >= w:
+            old = np.float64(x[i - w])
+            if np.isinf(old):
+                ninf -= 1
+            elif not np.isnan(old):
+                nobs -= 1
+                if nobs > 0:
+                    delta = old - mean
+                    mean -= delta / nobs
+                    ssqdm -= delta * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+
+        if ninf == 0 and nobs >= w and nobs > 1:
+            out[i] = np.sqrt(max(ssqdm, 0.0) / (nobs - 1))
+        else:
+            out[i] = np.nan
+
+
+@njit(cache=True, fastmath=FASTMATH)
+def rolling_std(x, w):
+    """
+    Écart-type mobile (ddof=1) sur une fenêtre de `w` valeurs
+
+    Args:
+        x (np.ndarray): Série float64
+        w (int): Taille de la fenêtre
+
+    Returns:
+        np.ndarray: Écart-type mobile, même longueur que x
+    """
+    out = np.empty(len(x), dtype=np.float64)
+    rolling_std_into(x, w, out)
+    return out
+
+
+@njit(cache=True, fastmath=FASTMATH, error_model="numpy")
+def pct_change_pct(x, out):
+    """
+    Variation en % d'un jour sur l'autre, écrite dans `out` en une passe
+
+    Équivalent fusionné de `pct_change() * 100` : une lecture, une écriture,
+    sans tableau intermédiaire. out[0] vaut NaN. Le rapport est calculé en
+    float64 quel que soit le type de l'entrée.
+
+    Args:
+        x (np.ndarray): Série float32 ou float64
+        out (np.ndarray): Tableau de sortie préalloué, même longueur que x
+    """
+    if len(x) == 0:
+        return
+    out[0] = np.nan
+    for i in range(1, len(x)):
+        out[i] = (np.float64(x[i]) / np.float64(x[i - 1]) - 1.0) * 100.0
+
+
+@njit(cache=True)
+def compact_into(keep, src, dst):
+    """
+    Copie les valeurs de `src` retenues par `keep` dans `dst`, en une passe
+
+    Équivalent de `dst[:] = src[keep]` sans tableau intermédiaire ; la
+    conversion de type (float32 -> float64) se fait à l'écriture.
+
+    Args:
+        keep (np.ndarray): Masque booléen, même longueur que src
+        src (np.ndarray): Série source
+        dst (np.ndarray): Tableau de sortie préalloué, de longueur keep.sum()
+    """
+    j = 0
+    for i in range(len(src)):
+        if keep[i]:
+            dst[j] = src[i]
+            j += 1
+
+
+@njit(parallel=True, cache=True, fastmath=FASTMATH, error_model="numpy")
+def all_metrics(prices, volumes, starts, ends,
+                daily_return, volatility_7d, volatility_30d, volume_change):
+    """
+    Calcule les métriques de toutes les cryptos, une crypto par thread
+
+    Les séries sont triées par (crypto, date) et la crypto g occupe la tranche
+    [starts[g], ends[g]). Chaque itération n'écrit que dans sa propre tranche
+    des tableaux de sortie : aucune synchronisation n'est nécessaire.
+    Entrées et sorties peuvent être en float32 (moitié moins de bande passante),
+    les calculs intermédiaires sont faits en float64.
+
+    Args:
+        prices (np.ndarray): Prix concaténés (float32)
+        volumes (np.ndarray): Volumes concaténés (float32)
+        starts (np.ndarray): Début de la tranche de chaque crypto
+        ends (np.ndarray): Fin (exclue) de la tranche de chaque crypto
+        daily_return, volatility_7d, volatility_30d, volume_change (np.ndarray):
+            Tableaux de sortie préalloués, même longueur que prices
+    """
+    for g in prange(len(starts)):
+        s = starts[g]
+        e = ends[g]
+        pct_change_pct(prices[s:e], daily_return[s:e])
+        pct_change_pct(volumes[s:e], volume_change[s:e])
+        rolling_std_into(daily_return[s:e], 7, volatility_7d[s:e])
+        rolling_std_into(daily_return[s:e], 30, volatility_30d[s:e])
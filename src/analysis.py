@@ -9,26 +9,179 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from datetime import datetime
+import gc
 import os
 
 # Configuration
 DB_PATH = "data/crypto_market.db"
 QUERIES_PATH = "sql/queries.sql"
 VIZ_DIR = "visualizations"
+RAW_DATA_DIR = "data/raw"
+
+# Nombre max de lignes affichées par requête (VERBOSE=1 pour tout afficher)
+MAX_PRINT_ROWS = 20
+VERBOSE = os.environ.get("VERBOSE") == "1"
+
+# Source des données: "sqlite" (défaut) ou "parquet" (visualisations seules, sans SQL)
+ANALYSIS_SOURCE = os.environ.get("ANALYSIS_SOURCE", "sqlite")
+
+# PRAGMAs de connexion adaptées à une charge d'analyse (lectures seules, rien n'est
+# écrit dans le fichier de la base)
+SQLITE_PRAGMAS = """
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+"""
+
+# Types explicites des colonnes lues en SQL (pas d'inférence, pas de repli en object)
+PRICE_DTYPES = {
+    'price_usd': 'float64',
+    'market_cap': 'float64',
+    'total_volume': 'float64',
+    'price_normalized': 'float64',
+}
+METRICS_DTYPES = {
+    'daily_return': 'float64',
+    'volatility_7d': 'float64',
+    'volatility_30d': 'float64',
+    'volume_change_24h': 'float64',
+}
 
 # Style des graphiques
 plt.style.use('seaborn-v0_8-darkgrid')
+# Identifiants SVG (clip-paths, glyphes) stables d'une exécution à l'autre
+plt.rcParams['svg.hashsalt'] = 'crypto-market-analytics'
 sns.set_palette("husl")
 
+# Palettes précalculées (1 à 11 couleurs) pour éviter de les régénérer à chaque graphique
+PALETTES = {
+    name: {n: sns.color_palette(name, n) for n in range(1, 12)}
+    for name in ("husl", "RdYlGn_r", "Set3")
+}
+
+# Options d'export des figures (PNG pour les graphiques denses, SVG vectoriel sinon)
+SAVE_KW = dict(dpi=150, bbox_inches='tight')
+# Sans date de création : un SVG régénéré sur les mêmes données est identique
+SVG_SAVE_KW = dict(format='svg', metadata={'Date': None})
+
 
 def create_viz_directory():
     """Crée le dossier pour les visualisations"""
     os.makedirs(VIZ_DIR, exist_ok=True)
 
 
+def get_palette(name, n_colors):
+    """Retourne une palette précalculée, ou la génère si elle n'est pas en cache"""
+    return PALETTES.get(name, {}).get(n_colors) or sns.color_palette(name, n_colors)
+
+
+def save_figure(filepath, save_kw=SAVE_KW):
+    """Sauvegarde la figure courante puis libère la mémoire de Matplotlib"""
+    plt.savefig(filepath, **save_kw)
+    plt.close('all')
+    gc.collect()
+
+
 def connect_db():
-    """Établit la connexion à la base de données"""
-    return sqlite3.connect(DB_PATH)
+    """
+    Établit une connexion en lecture seule à la base de données
+    
+    Les index sont créés par database.py (sql/schema.sql) : l'analyse
+    n'écrit jamais dans le fichier de la base.
+    """
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    conn.executescript(SQLITE_PRAGMAS)
+    return conn
+
+
+def load_price_history(conn):
+    """
+    Charge l'historique complet des prix, partagé par plusieurs graphiques
+    
+    Le prix normalisé (base 100 = premier jour) est calculé directement
+    par SQLite via une fonction de fenêtrage.
+    
+    Returns:
+        pd.DataFrame: symbol, date, price_usd, market_cap, total_volume, price_normalized
+    """
+    query = """
+    SELECT 
+        c.symbol,
+        ph.date,
+        ph.price_usd,
+        ph.market_cap,
+        ph.total_volume,
+        ph.price_usd / FIRST_VALUE(ph.price_usd) OVER (
+            PARTITION BY ph.crypto_pk ORDER BY ph.date
+        ) * 100 as price_normalized
+    FROM price_history ph
+    JOIN cryptocurrencies c ON ph.crypto_pk = c.crypto_pk
+    ORDER BY ph.date, c.symbol
+    """
+    return pd.read_sql_query(query, conn, parse_dates=['date'], dtype=PRICE_DTYPES)
+
+
+def load_base_data(conn):
+    """
+    Charge en une fois les tables utilisées par tous les graphiques
+    
+    Returns:
+        tuple: (prices, cryptos, metrics) sous forme de DataFrames
+    """
+    prices = load_price_history(conn)
+    cryptos = pd.read_sql_query("SELECT crypto_id, symbol, name FROM cryptocurrencies", conn)
+    
+    query = """
+    SELECT 
+        c.symbol,
+        m.date,
+        m.daily_return,
+        m.volatility_7d,
+        m.volatility_30d,
+        m.volume_change_24h
+    FROM metrics m
+    JOIN cryptocurrencies c ON m.crypto_pk = c.crypto_pk
+    ORDER BY m.date, c.symbol
+    """
+    metrics = pd.read_sql_query(query, conn, parse_dates=['date'], dtype=METRICS_DTYPES)
+    
+    return prices, cryptos, metrics
+
+
+def load_from_parquet():
+    """
+    Charge l'historique des prix directement depuis les fichiers Parquet bruts
+    
+    Même format que load_price_history, sans passer par SQLite.
+    
+    Returns:
+        tuple: (prices, cryptos) sous forme de DataFrames
+    """
+    cryptos = pd.read_parquet(
+        os.path.join(RAW_DATA_DIR, "crypto_info.parquet"),
+        columns=['id', 'symbol', 'name']
+    ).rename(columns={'id': 'crypto_id'})
+    
+    history = pd.read_parquet(
+        os.path.join(RAW_DATA_DIR, "price_history.parquet"),
+        columns=['crypto_id', 'date', 'price', 'market_cap', 'volume']
+    )
+    history = history.drop_duplicates(subset=['crypto_id', 'date'], keep='last')
+    
+    prices = history.merge(cryptos[['crypto_id', 'symbol']], on='crypto_id')
+    prices = prices.rename(columns={
+        'price': 'price_usd',
+        'volume': 'total_volume'
+    })
+    prices['date'] = pd.to_datetime(prices['date'])
+    prices = prices.sort_values(['date', 'symbol'], ignore_index=True)
+    
+    # Pas de SQLite ici : normalisation base 100 faite en pandas
+    first_price = prices.groupby('symbol')['price_usd'].transform('first')
+    prices['price_normalized'] = prices['price_usd'] / first_price * 100
+    
+    columns = ['symbol', 'date', 'price_usd', 'market_cap', 'total_volume', 'price_normalized']
+    return prices[columns], cryptos
 
 
 def execute_query(conn, query_name, query):
@@ -48,42 +201,26 @@ def execute_query(conn, query_name, query):
     print('='*60)
     
     df = pd.read_sql_query(query, conn)
-    print(df.to_string(index=False))
+    if len(df) > MAX_PRINT_ROWS and not VERBOSE:
+        print(df.head(MAX_PRINT_ROWS).to_string(index=False))
+        print(f"... ({len(df) - MAX_PRINT_ROWS} lignes non affichées)")
+    else:
+        print(df.to_string(index=False))
     
     return df
 
 
-def plot_price_evolution(conn):
+def plot_price_evolution(df):
     """Graphique de l'évolution des prix (normalisé à 100 pour comparaison)"""
     print("\n\n Génération: Évolution des prix...")
     
-    # Récupère TOUTES les cryptos disponibles dynamiquement
-    query = """
-    SELECT 
-        c.symbol,
-        ph.date,
-        ph.price_usd
-    FROM price_history ph
-    JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
-    ORDER BY ph.date, c.symbol
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Normalisation à 100 pour chaque crypto (base = premier jour)
-    df_normalized = df.copy()
-    for symbol in df['symbol'].unique():
-        mask = df['symbol'] == symbol
-        first_price = df.loc[mask, 'price_usd'].iloc[0]
-        df_normalized.loc[mask, 'price_normalized'] = (df.loc[mask, 'price_usd'] / first_price) * 100
-    
+    # price_normalized (base 100 = premier jour) est fourni par load_price_history
     plt.figure(figsize=(14, 8))
     
-    for symbol in df_normalized['symbol'].unique():
-        df_symbol = df_normalized[df_normalized['symbol'] == symbol]
+    for symbol, df_symbol in df.groupby('symbol', sort=True):
         plt.plot(df_symbol['date'], df_symbol['price_normalized'], 
-                label=symbol, linewidth=2.5, marker='o', markersize=2, alpha=0.8)
+                label=symbol, linewidth=2.5, marker='o', markersize=2, alpha=0.8,
+                rasterized=True)
     
     plt.title('Évolution des Prix (Base 100)', fontsize=16, fontweight='bold')
     plt.xlabel('Date', fontsize=12)
@@ -95,32 +232,29 @@ def plot_price_evolution(conn):
     plt.tight_layout()
     
     filepath = os.path.join(VIZ_DIR, '01_price_evolution.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    save_figure(filepath)
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
-def plot_volatility_comparison(conn):
+def plot_volatility_comparison(df_metrics):
     """Comparaison des volatilités"""
     print("\n Génération: Comparaison des volatilités...")
     
-    query = """
-    SELECT 
-        c.symbol,
-        c.name,
-        ROUND(AVG(m.volatility_30d), 2) as avg_volatility
-    FROM cryptocurrencies c
-    JOIN metrics m ON c.crypto_id = m.crypto_id
-    WHERE m.volatility_30d IS NOT NULL
-    GROUP BY c.symbol, c.name
-    ORDER BY avg_volatility DESC
-    """
-    
-    df = pd.read_sql_query(query, conn)
+    # Volatilité 30j moyenne par crypto (les NaN sont ignorés par mean)
+    df = (
+        df_metrics.groupby('symbol')['volatility_30d'].mean()
+        .dropna()
+        .round(2)
+        .sort_values(ascending=False)
+        .rename('avg_volatility')
+        .reset_index()
+    )
     
     plt.figure(figsize=(12, 8))
-    colors = sns.color_palette("RdYlGn_r", len(df))
+    colors = get_palette("RdYlGn_r", len(df))
     
     bars = plt.barh(df['symbol'], df['avg_volatility'], color=colors)
     
@@ -130,45 +264,35 @@ def plot_volatility_comparison(conn):
     plt.grid(True, alpha=0.3, axis='x')
     
     # Ajout des valeurs sur les barres
-    for i, bar in enumerate(bars):
-        width = bar.get_width()
-        plt.text(width, bar.get_y() + bar.get_height()/2, 
-                f'{width:.2f}%',
-                ha='left', va='center', fontsize=9, fontweight='bold')
+    ax = plt.gca()
+    ax.bar_label(bars, labels=[f'{w:.2f}%' for w in df['avg_volatility']],
+                 padding=3, fontsize=9, fontweight='bold')
     
     plt.tight_layout()
     
-    filepath = os.path.join(VIZ_DIR, '02_volatility_comparison.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    filepath = os.path.join(VIZ_DIR, '02_volatility_comparison.svg')
+    save_figure(filepath, SVG_SAVE_KW)
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
-def plot_correlation_heatmap(conn):
+def plot_correlation_heatmap(df):
     """Heatmap des corrélations entre cryptos"""
     print("\n Génération: Heatmap de corrélations...")
     
-    query = """
-    SELECT 
-        c.symbol,
-        ph.date,
-        ph.price_usd
-    FROM price_history ph
-    JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
-    ORDER BY c.symbol, ph.date
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    
     # Pivot pour avoir les cryptos en colonnes
     df_pivot = df.pivot(index='date', columns='symbol', values='price_usd')
     
-    # Calcul des rendements quotidiens
-    returns = df_pivot.pct_change().dropna()
+    # Calcul des log-rendements quotidiens sur une matrice float64 contiguë
+    prices = df_pivot.to_numpy(dtype=np.float64)
+    returns = np.log(prices[1:] / prices[:-1])
+    valid = ~np.isnan(returns).any(axis=1)
     
-    # Matrice de corrélation
-    corr_matrix = returns.corr()
+    # Matrice de corrélation (un seul appel NumPy vectorisé)
+    corr = np.corrcoef(returns[valid].T)
+    corr_matrix = pd.DataFrame(corr, index=df_pivot.columns, columns=df_pivot.columns)
     
     # Taille dynamique selon nombre de cryptos
     n_cryptos = len(corr_matrix)
@@ -193,38 +317,25 @@ def plot_correlation_heatmap(conn):
     plt.tight_layout()
     
     filepath = os.path.join(VIZ_DIR, '03_correlation_heatmap.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    save_figure(filepath)
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
-def plot_market_dominance(conn):
+def plot_market_dominance(df_prices, df_cryptos):
     """Camembert de la dominance du marché"""
     print("\n Génération: Market dominance...")
     
-    query = """
-    WITH latest_marketcap AS (
-        SELECT 
-            c.symbol,
-            c.name,
-            ph.market_cap
-        FROM cryptocurrencies c
-        JOIN price_history ph ON c.crypto_id = ph.crypto_id
-        WHERE ph.date = (SELECT MAX(date) FROM price_history)
-    )
-    SELECT 
-        symbol,
-        name,
-        market_cap / 1000000000 as market_cap_billions
-    FROM latest_marketcap
-    ORDER BY market_cap DESC
-    """
-    
-    df = pd.read_sql_query(query, conn)
+    # Dernier snapshot de market cap de chaque crypto (équivalent de ROW_NUMBER() = 1)
+    df = df_prices.sort_values('date').groupby('symbol').tail(1)[['symbol', 'market_cap']]
+    df = df.sort_values('market_cap', ascending=False, ignore_index=True)
+    df['name'] = df['symbol'].map(df_cryptos.set_index('symbol')['name'])
+    df['market_cap_billions'] = df['market_cap'] / 1000000000
     
     plt.figure(figsize=(14, 10))
-    colors = sns.color_palette('Set3', len(df))
+    colors = get_palette("Set3", len(df))
     
     # Fonction pour formater les labels avec pourcentage
     def make_autopct(values):
@@ -262,39 +373,35 @@ def plot_market_dominance(conn):
     
     plt.tight_layout()
     
-    filepath = os.path.join(VIZ_DIR, '04_market_dominance.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    filepath = os.path.join(VIZ_DIR, '04_market_dominance.svg')
+    # bbox 'tight' conservé : la légende est placée hors des axes
+    save_figure(filepath, dict(SVG_SAVE_KW, bbox_inches='tight'))
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
-def plot_performance_comparison(conn):
+def plot_performance_comparison(df_prices):
     """Comparaison des performances sur 30 jours"""
     print("\n Génération: Comparaison des performances...")
     
-    query = """
-    SELECT 
-        c.symbol,
-        ROUND(
-            (latest.price_usd - first.price_usd) / first.price_usd * 100, 
-            2
-        ) as performance_30d
-    FROM cryptocurrencies c
-    JOIN (
-        SELECT crypto_id, price_usd
-        FROM price_history
-        WHERE date = (SELECT MAX(date) FROM price_history)
-    ) latest ON c.crypto_id = latest.crypto_id
-    JOIN (
-        SELECT crypto_id, price_usd
-        FROM price_history
-        WHERE date = (SELECT date(MAX(date), '-30 days') FROM price_history)
-    ) first ON c.crypto_id = first.crypto_id
-    ORDER BY performance_30d DESC
-    """
-    
-    df = pd.read_sql_query(query, conn)
+    # Prix au dernier jour et 30 jours avant, indexés par symbole
+    max_date = df_prices['date'].max()
+    prices_by_date = df_prices.set_index('symbol')
+    latest = prices_by_date.loc[prices_by_date['date'] == max_date, 'price_usd']
+    first = prices_by_date.loc[prices_by_date['date'] == max_date - pd.Timedelta(days=30), 'price_usd']
+    
+    # Seules les cryptos présentes aux deux dates sont conservées
+    df = (
+        ((latest - first) / first * 100)
+        .dropna()
+        .round(2)
+        .sort_values(ascending=False)
+        .rename('performance_30d')
+        .rename_axis('symbol')
+        .reset_index()
+    )
     
     plt.figure(figsize=(12, 8))
     
@@ -309,44 +416,28 @@ def plot_performance_comparison(conn):
     plt.axvline(x=0, color='black', linestyle='-', linewidth=0.8)
     plt.grid(True, alpha=0.3, axis='x')
     
-    # Ajout des valeurs
-    for i, bar in enumerate(bars):
-        width = bar.get_width()
-        label_x_pos = width + 0.5 if width > 0 else width - 0.5
-        plt.text(label_x_pos, bar.get_y() + bar.get_height()/2, 
-                f'{width:.1f}%',
-                ha='left' if width > 0 else 'right', 
-                va='center', fontsize=9, fontweight='bold')
+    # Ajout des valeurs (bar_label place le texte du bon côté selon le signe)
+    ax = plt.gca()
+    ax.bar_label(bars, labels=[f'{w:.1f}%' for w in df['performance_30d']],
+                 padding=3, fontsize=9, fontweight='bold')
     
     plt.tight_layout()
     
-    filepath = os.path.join(VIZ_DIR, '05_performance_30d.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    filepath = os.path.join(VIZ_DIR, '05_performance_30d.svg')
+    save_figure(filepath, SVG_SAVE_KW)
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
-def plot_volume_analysis(conn):
+def plot_volume_analysis(df):
     """Analyse des volumes de trading - toutes les cryptos disponibles"""
     print("\n Génération: Analyse des volumes...")
     
-    # Récupère TOUTES les cryptos disponibles
-    query = """
-    SELECT 
-        c.symbol,
-        ph.date,
-        ph.total_volume / 1000000000 as volume_billions
-    FROM price_history ph
-    JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
-    ORDER BY ph.date, c.symbol
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    df['date'] = pd.to_datetime(df['date'])
+    df = df.assign(volume_billions=df['total_volume'] / 1000000000)
     
-    symbols = sorted(df['symbol'].unique())
-    n_symbols = len(symbols)
+    n_symbols = df['symbol'].nunique()
     
     # Configuration de la grille selon le nombre de cryptos
     if n_symbols <= 2:
@@ -370,13 +461,12 @@ def plot_volume_analysis(conn):
     else:
         axes = axes.ravel() if n_symbols > 1 else [axes]
     
-    colors = sns.color_palette("husl", n_symbols)
+    colors = get_palette("husl", n_symbols)
     
-    for i, symbol in enumerate(symbols):
+    # groupby parcourt le DataFrame une seule fois (groupes triés par symbole)
+    for i, (symbol, df_symbol) in enumerate(df.groupby('symbol', sort=True)):
         if i >= len(axes):
             break
-            
-        df_symbol = df[df['symbol'] == symbol]
         
         axes[i].plot(df_symbol['date'], df_symbol['volume_billions'], 
                     linewidth=2, color=colors[i], alpha=0.8)
@@ -396,10 +486,11 @@ def plot_volume_analysis(conn):
     plt.tight_layout()
     
     filepath = os.path.join(VIZ_DIR, '06_volume_analysis.png')
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
+    save_figure(filepath)
     
     print(f"  ✓ Sauvegardé: {filepath}")
+    
+    return filepath
 
 
 def run_all_analyses():
@@ -418,18 +509,27 @@ def run_all_analyses():
     # Extraction de quelques requêtes clés à afficher
     queries = {
         "Top Performers (30j)": """
+            WITH bounds AS (
+                SELECT MAX(date) as max_d, date(MAX(date), '-30 days') as min_d
+                FROM price_history
+            ),
+            prices AS (
+                SELECT c.symbol, c.name,
+                       MAX(CASE WHEN ph.date = bounds.max_d THEN ph.price_usd END) as latest_price,
+                       MAX(CASE WHEN ph.date = bounds.min_d THEN ph.price_usd END) as first_price
+                FROM cryptocurrencies c
+                JOIN price_history ph ON ph.crypto_pk = c.crypto_pk
+                CROSS JOIN bounds
+                WHERE ph.date IN (bounds.min_d, bounds.max_d)
+                GROUP BY c.symbol, c.name
+                HAVING latest_price IS NOT NULL AND first_price IS NOT NULL
+            )
             SELECT 
-                c.symbol,
-                c.name,
-                ROUND((latest.price_usd - first.price_usd) / first.price_usd * 100, 2) as perf_30d,
-                ROUND(latest.price_usd, 2) as prix_actuel
-            FROM cryptocurrencies c
-            JOIN (SELECT crypto_id, price_usd FROM price_history 
-                  WHERE date = (SELECT MAX(date) FROM price_history)) latest 
-                  ON c.crypto_id = latest.crypto_id
-            JOIN (SELECT crypto_id, price_usd FROM price_history 
-                  WHERE date = (SELECT date(MAX(date), '-30 days') FROM price_history)) first 
-                  ON c.crypto_id = first.crypto_id
+                symbol,
+                name,
+                ROUND((latest_price - first_price) / first_price * 100, 2) as perf_30d,
+                ROUND(latest_price, 2) as prix_actuel
+            FROM prices
             ORDER BY perf_30d DESC LIMIT 5
         """,
         
@@ -443,19 +543,24 @@ def run_all_analyses():
                     ELSE 'Modéré'
                 END as categorie_risque
             FROM cryptocurrencies c
-            JOIN metrics m ON c.crypto_id = m.crypto_id
+            JOIN metrics m ON c.crypto_pk = m.crypto_pk
             WHERE m.volatility_30d IS NOT NULL
             GROUP BY c.symbol
             ORDER BY volatilite_moy DESC LIMIT 5
         """,
         
         "Market Dominance": """
-            WITH latest AS (
-                SELECT c.symbol, ph.market_cap,
-                       SUM(ph.market_cap) OVER () as total_cap
-                FROM cryptocurrencies c
-                JOIN price_history ph ON c.crypto_id = ph.crypto_id
-                WHERE ph.date = (SELECT MAX(date) FROM price_history)
+            WITH ranked AS (
+                SELECT crypto_pk, market_cap,
+                       ROW_NUMBER() OVER (PARTITION BY crypto_pk ORDER BY date DESC) as rn
+                FROM price_history
+            ),
+            latest AS (
+                SELECT c.symbol, r.market_cap,
+                       SUM(r.market_cap) OVER () as total_cap
+                FROM ranked r
+                JOIN cryptocurrencies c ON c.crypto_pk = r.crypto_pk
+                WHERE r.rn = 1
             )
             SELECT symbol,
                    ROUND(market_cap / 1000000000, 2) as cap_milliards,
@@ -474,19 +579,24 @@ def run_all_analyses():
     print(" GÉNÉRATION DES VISUALISATIONS")
     print("="*60)
     
-    plot_price_evolution(conn)
-    plot_volatility_comparison(conn)
-    plot_correlation_heatmap(conn)
-    plot_market_dominance(conn)
-    plot_performance_comparison(conn)
-    plot_volume_analysis(conn)
+    # Données chargées une seule fois ; chaque graphique les filtre en pandas
+    df_prices, df_cryptos, df_metrics = load_base_data(conn)
+    
+    generated = [
+        plot_price_evolution(df_prices),
+        plot_volatility_comparison(df_metrics),
+        plot_correlation_heatmap(df_prices),
+        plot_market_dominance(df_prices, df_cryptos),
+        plot_performance_comparison(df_prices),
+        plot_volume_analysis(df_prices),
+    ]
     
     conn.close()
     
     print("\n" + "="*60)
     print(" ANALYSES TERMINÉES!")
     print("="*60)
-    print(f"\n {len(os.listdir(VIZ_DIR))} visualisations générées dans: {VIZ_DIR}/")
+    print(f"\n {len(generated)} visualisations générées dans: {VIZ_DIR}/")
     print("\n Tu peux maintenant:")
     print("   1. Consulter les graphiques dans le dossier visualizations/")
     print("   2. Explorer la base avec: sqlite3 data/crypto_market.db")
@@ -494,10 +604,34 @@ def run_all_analyses():
     print("   4. Publier le projet sur GitHub! \n")
 
 
+def run_parquet_visualizations():
+    """Génère les graphiques basés sur les prix à partir des fichiers Parquet"""
+    print("\n" + "="*60)
+    print(" VISUALISATIONS DEPUIS LES FICHIERS PARQUET")
+    print("="*60)
+    
+    create_viz_directory()
+    df_prices, df_cryptos = load_from_parquet()
+    
+    # Les métriques (volatilité) n'existent que dans la base SQLite
+    plot_price_evolution(df_prices)
+    plot_correlation_heatmap(df_prices)
+    plot_market_dominance(df_prices, df_cryptos)
+    plot_performance_comparison(df_prices)
+    plot_volume_analysis(df_prices)
+    
+    print("\n" + "="*60)
+    print(" VISUALISATIONS TERMINÉES!")
+    print("="*60 + "\n")
+
+
 def main():
     """Fonction principale"""
     try:
-        run_all_analyses()
+        if ANALYSIS_SOURCE == "parquet":
+            run_parquet_visualizations()
+        else:
+            run_all_analyses()
     except Exception as e:
         print(f"\n ERREUR: {e}")
         raise
@@ -4,12 +4,23 @@ Récupère les prix historiques et informations des principales cryptomonnaies
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+import numpy as np
+import threading
 import time
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
 
+# Parsing JSON rapide avec orjson si disponible (repli sur la lib standard)
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Configuration
 API_BASE_URL = "https://api.coingecko.com/api/v3"
 DATA_DIR = "data/raw"
@@ -26,6 +37,94 @@ TOP_CRYPTOS = [
 # Nombre de jours d'historique à récupérer
 DAYS_OF_HISTORY = 90
 
+# Export CSV optionnel (Parquet par défaut) : EXPORT_CSV=1 pour l'activer
+EXPORT_CSV = os.environ.get("EXPORT_CSV") == "1"
+
+# Limites de l'API gratuite CoinGecko (~10-30 requêtes/minute)
+REQUESTS_PER_MINUTE = 25
+MAX_WORKERS = 4
+MAX_RETRIES = 5
+
+
+class RateLimiter:
+    """
+    Limiteur de débit partagé entre threads
+    
+    Garde l'horodatage des requêtes de la dernière minute dans une deque :
+    au plus `rate_per_min` requêtes par minute glissante. Une pause globale
+    peut être imposée après un 429 (en-tête Retry-After).
+    """
+    
+    def __init__(self, rate_per_min, period=60.0):
+        self._rate = rate_per_min
+        self._period = period
+        self._calls = deque()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+    
+    def pause(self, seconds):
+        """Suspend toutes les requêtes pendant `seconds` secondes"""
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+    
+    def wait(self):
+        """Bloque jusqu'à ce qu'une requête puisse être envoyée"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self._period:
+                    self._calls.popleft()
+                
+                if now >= self._resume_at and len(self._calls) < self._rate:
+                    self._calls.append(now)
+                    return
+                
+                delay = max(self._resume_at - now, 0.0)
+                if len(self._calls) >= self._rate:
+                    delay = max(delay, self._period - (now - self._calls[0]))
+            time.sleep(delay)
+
+
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+
+def parse_retry_after(response):
+    """Délai d'attente (en secondes) demandé par l'API, 1 par défaut"""
+    try:
+        return max(int(response.headers.get("Retry-After", "1")), 1)
+    except ValueError:
+        return 1
+
+
+def request_with_backoff(session, url, params=None):
+    """
+    Exécute une requête GET en respectant la limite de débit
+    
+    Les réponses 429 et 5xx sont retentées après le délai Retry-After :
+    on ne dort que lorsque l'API nous freine.
+    
+    Args:
+        session (requests.Session): Session HTTP partagée
+        url (str): URL à interroger
+        params (dict): Paramètres de la requête
+    
+    Returns:
+        requests.Response: Dernière réponse reçue
+    """
+    for attempt in range(1, MAX_RETRIES + 1):
+        rate_limiter.wait()
+        response = session.get(url, params=params, timeout=10)
+        
+        if response.status_code != 429 and response.status_code < 500:
+            return response
+        
+        if attempt < MAX_RETRIES:
+            retry_after = parse_retry_after(response)
+            print(f"  ⏳ HTTP {response.status_code}, nouvel essai dans {retry_after}s ({attempt}/{MAX_RETRIES})")
+            rate_limiter.pause(retry_after)
+    
+    return response
+
 
 def create_directories():
     """Crée les dossiers nécessaires s'ils n'existent pas"""
@@ -34,11 +133,21 @@ def create_directories():
     print(f"✓ Dossiers créés : {DATA_DIR}")
 
 
-def get_crypto_info(crypto_id):
+def create_session():
+    """Crée une session HTTP réutilisant les connexions TCP/TLS"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_crypto_info(session, crypto_id):
     """
     Récupère les informations de base d'une crypto
     
     Args:
+        session (requests.Session): Session HTTP partagée
         crypto_id (str): ID de la crypto sur CoinGecko
     
     Returns:
@@ -53,9 +162,9 @@ def get_crypto_info(crypto_id):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = request_with_backoff(session, url, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
         
         return {
             "id": data["id"],
@@ -66,16 +175,17 @@ def get_crypto_info(crypto_id):
             "market_cap": data["market_data"]["market_cap"]["usd"],
             "total_volume": data["market_data"]["total_volume"]["usd"],
         }
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"✗ Erreur lors de la récupération de {crypto_id}: {e}")
         return None
 
 
-def get_historical_prices(crypto_id, days=90):
+def get_historical_prices(session, crypto_id, days=90):
     """
     Récupère l'historique des prix d'une crypto
     
     Args:
+        session (requests.Session): Session HTTP partagée
         crypto_id (str): ID de la crypto sur CoinGecko
         days (int): Nombre de jours d'historique
     
@@ -90,28 +200,34 @@ def get_historical_prices(crypto_id, days=90):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = request_with_backoff(session, url, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
+        
+        # Conversion en tableaux float64 contigus (paires [timestamp, valeur])
+        prices = np.asarray(data["prices"], dtype=np.float64).reshape(-1, 2)
+        caps = np.asarray(data["market_caps"], dtype=np.float64).reshape(-1, 2)
+        vols = np.asarray(data["total_volumes"], dtype=np.float64).reshape(-1, 2)
         
         # Conversion en DataFrame
         df = pd.DataFrame({
-            "timestamp": [item[0] for item in data["prices"]],
-            "price": [item[1] for item in data["prices"]],
-            "market_cap": [item[1] for item in data["market_caps"]],
-            "volume": [item[1] for item in data["total_volumes"]]
+            "timestamp": prices[:, 0].astype("int64"),
+            "price": prices[:, 1],
+            "market_cap": caps[:, 1],
+            "volume": vols[:, 1]
         })
         
-        # Conversion timestamp -> date
-        df["date"] = pd.to_datetime(df["timestamp"], unit="ms").dt.date
-        df["crypto_id"] = crypto_id
+        # Conversion timestamp (ms) -> date, en arithmétique vectorisée datetime64
+        df["date"] = df["timestamp"].to_numpy().astype("datetime64[ms]").astype("datetime64[D]")
+        # Catégorie partagée par toutes les cryptos : codes entiers après concat
+        df["crypto_id"] = pd.Categorical([crypto_id] * len(df), categories=TOP_CRYPTOS)
         
         # Réorganisation des colonnes
         df = df[["crypto_id", "date", "price", "market_cap", "volume"]]
         
         return df
     
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"✗ Erreur lors de la récupération de l'historique de {crypto_id}: {e}")
         return pd.DataFrame()
 
@@ -130,24 +246,32 @@ def collect_all_data():
     crypto_info_list = []
     historical_data_list = []
     
-    for i, crypto_id in enumerate(TOP_CRYPTOS, 1):
-        print(f"[{i}/{len(TOP_CRYPTOS)}] Traitement de {crypto_id}...")
-        
-        # Info de base
-        info = get_crypto_info(crypto_id)
-        if info:
-            crypto_info_list.append(info)
-            print(f"  ✓ Info récupérée: {info['name']} ({info['symbol']})")
-        
-        # Historique des prix
-        historical = get_historical_prices(crypto_id, DAYS_OF_HISTORY)
-        if not historical.empty:
-            historical_data_list.append(historical)
-            print(f"  ✓ Historique récupéré: {len(historical)} jours")
+    # Requêtes lancées en parallèle ; le RateLimiter garantit le respect des limites de l'API
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            (
+                crypto_id,
+                executor.submit(get_crypto_info, session, crypto_id),
+                executor.submit(get_historical_prices, session, crypto_id, DAYS_OF_HISTORY),
+            )
+            for crypto_id in TOP_CRYPTOS
+        ]
         
-        # Pause pour respecter les limites de l'API (rate limiting)
-        if i < len(TOP_CRYPTOS):
-            time.sleep(17.5) #Pour pas trop surcharger coingeeko vu que c'est une api gratuite mais pouvoir recup des crypto en polus grand nombre
+        # Résultats récupérés dans l'ordre de TOP_CRYPTOS
+        for i, (crypto_id, info_future, historical_future) in enumerate(futures, 1):
+            print(f"[{i}/{len(TOP_CRYPTOS)}] Traitement de {crypto_id}...")
+            
+            # Info de base
+            info = info_future.result()
+            if info:
+                crypto_info_list.append(info)
+                print(f"  ✓ Info récupérée: {info['name']} ({info['symbol']})")
+            
+            # Historique des prix
+            historical = historical_future.result()
+            if not historical.empty:
+                historical_data_list.append(historical)
+                print(f"  ✓ Historique récupéré: {len(historical)} jours")
     
     # Sauvegarde des données
     print("\n" + "-"*60)
@@ -157,17 +281,21 @@ def collect_all_data():
     # DataFrame des infos
     if crypto_info_list:
         df_info = pd.DataFrame(crypto_info_list)
-        info_path = os.path.join(DATA_DIR, "crypto_info.csv")
-        df_info.to_csv(info_path, index=False)
+        info_path = os.path.join(DATA_DIR, "crypto_info.parquet")
+        df_info.to_parquet(info_path, compression="zstd", index=False)
         print(f"✓ Infos sauvegardées: {info_path}")
+        if EXPORT_CSV:
+            df_info.to_csv(os.path.join(DATA_DIR, "crypto_info.csv"), index=False)
         print(f"  → {len(df_info)} cryptos")
     
     # DataFrame de l'historique
     if historical_data_list:
         df_historical = pd.concat(historical_data_list, ignore_index=True)
-        historical_path = os.path.join(DATA_DIR, "price_history.csv")
-        df_historical.to_csv(historical_path, index=False)
+        historical_path = os.path.join(DATA_DIR, "price_history.parquet")
+        df_historical.to_parquet(historical_path, compression="zstd", index=False)
         print(f"✓ Historique sauvegardé: {historical_path}")
+        if EXPORT_CSV:
+            df_historical.to_csv(os.path.join(DATA_DIR, "price_history.csv"), index=False)
         print(f"  → {len(df_historical)} lignes de données")
     
     # Métadonnées de la collecte
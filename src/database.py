@@ -6,14 +6,210 @@ Crée la base, importe les données et calcule les métriques
 import sqlite3
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, date
+import math
 import os
+import re
+import shutil
+import subprocess
+from functools import lru_cache
+from itertools import compress, islice
+
+from _kernels import all_metrics, compact_into, group_bounds
 
 # Configuration
 DB_PATH = "data/crypto_market.db"
 SCHEMA_PATH = "sql/schema.sql"
 RAW_DATA_DIR = "data/raw"
 
+# Import direct du CSV de prix par la CLI sqlite3 (.import), sans passer par pandas
+# À n'activer que pour un CSV propre : CSV_FAST_IMPORT=1
+CSV_FAST_IMPORT = os.environ.get("CSV_FAST_IMPORT") == "1"
+SQLITE3_CLI = shutil.which("sqlite3")
+
+# Calcul des métriques entièrement en SQL (fonctions de fenêtrage) : METRICS_IN_SQL=1
+# Nécessite Connection.create_window_function (Python 3.11+). Calcul sur les prix
+# float64 : écarts relatifs jusqu'à ~5e-4 avec le noyau Numba (entrées float32)
+METRICS_IN_SQL = os.environ.get("METRICS_IN_SQL") == "1"
+
+# Table brute -> price_history : clé crypto_pk, dernière ligne par (crypto, jour)
+# (prix vide -> NULL : la contrainte NOT NULL fait échouer l'import, comme via pandas)
+STAGE_TO_PRICE_SQL = """
+INSERT INTO price_history (crypto_pk, date, price_usd, market_cap, total_volume)
+SELECT c.crypto_pk, date(s.date), CAST(NULLIF(s.price, '') AS REAL),
+       CAST(NULLIF(s.market_cap, '') AS REAL), CAST(NULLIF(s.volume, '') AS REAL)
+FROM price_history_stage s
+JOIN cryptocurrencies c ON c.crypto_id = s.crypto_id
+WHERE s.rowid IN (
+    SELECT MAX(rowid) FROM price_history_stage GROUP BY crypto_id, date(date)
+)
+ORDER BY c.crypto_pk, date(s.date)
+"""
+
+# PRAGMAs de chargement en masse (WAL + synchronisation NORMAL, cache de ~200 Mo)
+# WAL ne sert que pendant le chargement : FINAL_PRAGMAS rétablit un fichier unique
+LOAD_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-200000;
+"""
+
+# Base livrée en mode rollback-journal : un seul fichier, lisible sans droit d'écriture
+# (le changement de mode fait un checkpoint et supprime les fichiers -wal/-shm)
+FINAL_PRAGMAS = """
+PRAGMA journal_mode=DELETE;
+"""
+
+# Instructions CREATE INDEX du schéma (créées après le chargement des données)
+INDEX_DDL_RE = re.compile(r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b[^;]*;", re.IGNORECASE | re.MULTILINE)
+
+# Nombre de lignes par appel à executemany
+BATCH_SIZE = 20000
+
+# Colonnes insérées dans chaque table
+CRYPTO_COLUMNS = ["crypto_pk", "crypto_id", "symbol", "name"]
+PRICE_COLUMNS = ["crypto_pk", "date", "price_usd", "market_cap", "total_volume"]
+METRICS_COLUMNS = [
+    "crypto_pk", "date", "daily_return",
+    "volatility_7d", "volatility_30d", "volume_change_24h"
+]
+
+
+def insert_statement(table, cols):
+    """Requête INSERT paramétrée pour les colonnes données"""
+    return f"INSERT INTO {table} ({','.join(cols)}) VALUES ({','.join('?' * len(cols))})"
+
+
+# Requêtes INSERT construites une seule fois au chargement du module
+INSERT_CRYPTO = insert_statement("cryptocurrencies", CRYPTO_COLUMNS)
+INSERT_PRICE = insert_statement("price_history", PRICE_COLUMNS)
+INSERT_METRICS = insert_statement("metrics", METRICS_COLUMNS)
+
+# Colonnes et types des fichiers bruts : le parseur alloue directement les bons tableaux
+RAW_COLUMNS = {
+    "crypto_info": ["id", "symbol", "name"],
+    "price_history": ["crypto_id", "date", "price", "market_cap", "volume"],
+}
+RAW_CSV_OPTIONS = {
+    "crypto_info": dict(dtype={"id": str, "symbol": str, "name": str}),
+    "price_history": dict(
+        dtype={"crypto_id": "category", "price": "float64",
+               "market_cap": "float64", "volume": "float64"},
+        parse_dates=["date"],
+        cache_dates=True,
+    ),
+}
+
+# Métriques calculées dans SQLite : rendements via LAG, volatilités via stddev()
+# (NULL tant que la fenêtre ne contient pas 7 / 30 rendements, comme le noyau Numba).
+# SQLite rend NULL pour x / 0 : la valeur précédente nulle est traitée à part pour
+# retrouver la sémantique pandas du noyau (x * 9e999 = ±inf, ou NULL pour 0 / 0)
+METRICS_SQL = """
+INSERT INTO metrics (crypto_pk, date, daily_return, volatility_7d, volatility_30d, volume_change_24h)
+WITH returns AS (
+    SELECT crypto_pk, date,
+           CASE WHEN LAG(price_usd) OVER w = 0 THEN price_usd * 9e999
+                ELSE (price_usd / LAG(price_usd) OVER w - 1.0) * 100.0
+           END as daily_return,
+           CASE WHEN LAG(total_volume) OVER w = 0 THEN total_volume * 9e999
+                ELSE (total_volume / LAG(total_volume) OVER w - 1.0) * 100.0
+           END as volume_change_24h
+    FROM price_history
+    WINDOW w AS (PARTITION BY crypto_pk ORDER BY date)
+),
+volatility AS (
+    SELECT crypto_pk, date, daily_return,
+           CASE WHEN COUNT(daily_return) OVER w7 = 7
+                THEN stddev(daily_return) OVER w7 END as volatility_7d,
+           CASE WHEN COUNT(daily_return) OVER w30 = 30
+                THEN stddev(daily_return) OVER w30 END as volatility_30d,
+           volume_change_24h
+    FROM returns
+    WINDOW w7 AS (PARTITION BY crypto_pk ORDER BY date ROWS 6 PRECEDING),
+           w30 AS (PARTITION BY crypto_pk ORDER BY date ROWS 29 PRECEDING)
+)
+SELECT crypto_pk, date, daily_return, volatility_7d, volatility_30d, volume_change_24h
+FROM volatility
+WHERE daily_return IS NOT NULL
+ORDER BY crypto_pk, date
+"""
+
+# Adaptateurs explicites pour les dates (l'adaptateur par défaut est déprécié)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(np.datetime64, lambda d: np.datetime_as_string(d, unit="D"))
+# Clés crypto_pk en int32 : sans adaptateur, sqlite3 les stockerait en BLOB
+sqlite3.register_adapter(np.int32, int)
+
+
+def read_raw_data(name):
+    """
+    Lit un fichier de données brutes (Parquet si disponible, sinon CSV)
+    
+    Args:
+        name (str): Nom du fichier sans extension (ex: "price_history")
+    
+    Returns:
+        pd.DataFrame: Données brutes
+    """
+    parquet_path = os.path.join(RAW_DATA_DIR, f"{name}.parquet")
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, columns=RAW_COLUMNS[name])
+    
+    csv_path = os.path.join(RAW_DATA_DIR, f"{name}.csv")
+    return pd.read_csv(csv_path, usecols=RAW_COLUMNS[name], **RAW_CSV_OPTIONS[name])
+
+
+def iter_rows_nan_to_none(rows):
+    """
+    Génère les lignes en tuples, NaN remplacés par None (NULL)
+    
+    Conversion faite à la volée (x != x n'est vrai que pour NaN),
+    sans masque ni copie des données.
+    """
+    for row in rows:
+        yield tuple(None if x != x else x for x in row)
+
+
+def bulk_insert(conn, query, rows):
+    """
+    Insère des lignes en masse par lots de BATCH_SIZE via executemany
+    
+    Aucune transaction n'est ouverte ici : le chargement complet tourne
+    dans la transaction BEGIN IMMEDIATE ouverte par main().
+    
+    Args:
+        conn: Connexion à la base
+        query (str): Requête INSERT paramétrée (INSERT_CRYPTO, INSERT_PRICE...)
+        rows (iterable): Tuples de valeurs, dans l'ordre des colonnes de la requête
+    """
+    rows = iter(rows)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        conn.executemany(query, batch)
+
+
+def read_schema():
+    """
+    Lit le schéma SQL et sépare les tables/vues des index secondaires
+    
+    Le résultat est mis en cache tant que le fichier n'est pas modifié.
+    
+    Returns:
+        tuple: (ddl des tables et vues, ddl des index)
+    """
+    return _parse_schema(SCHEMA_PATH, os.path.getmtime(SCHEMA_PATH))
+
+
+@lru_cache(maxsize=1)
+def _parse_schema(path, mtime):
+    """Lecture et découpage du schéma, mis en cache par (chemin, date de modification)"""
+    with open(path, 'r') as f:
+        schema_sql = f.read()
+    
+    index_ddl = "\n".join(m.group(0).strip() for m in INDEX_DDL_RE.finditer(schema_sql))
+    table_ddl = INDEX_DDL_RE.sub("", schema_sql)
+    return table_ddl, index_ddl
+
 
 def create_database():
     """Crée la base de données et exécute le schéma SQL"""
@@ -21,24 +217,25 @@ def create_database():
     print("  CRÉATION DE LA BASE DE DONNÉES")
     print("="*60 + "\n")
     
-    # Suppression de l'ancienne base si elle existe
+    # Suppression de l'ancienne base si elle existe (et de ses fichiers WAL)
     if os.path.exists(DB_PATH):
         os.remove(DB_PATH)
         print("✓ Ancienne base supprimée")
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
     
     # Création de la nouvelle base
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Lecture et exécution du schéma
-    with open(SCHEMA_PATH, 'r') as f:
-        schema_sql = f.read()
+    # (mode autocommit : les transactions sont ouvertes explicitement par main)
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    conn.executescript(LOAD_PRAGMAS)
     
-    cursor.executescript(schema_sql)
-    conn.commit()
+    # Lecture et exécution du schéma (index secondaires différés après l'import)
+    table_ddl, _ = read_schema()
+    conn.executescript(table_ddl)
     
     print(f"✓ Base de données créée: {DB_PATH}")
-    print("✓ Schéma appliqué")
+    print("✓ Schéma appliqué (index créés après l'import)")
     
     return conn
 
@@ -49,16 +246,17 @@ def import_cryptocurrencies(conn):
     print(" IMPORT DES CRYPTOMONNAIES")
     print("-"*60 + "\n")
     
-    # Lecture du CSV
-    info_path = os.path.join(RAW_DATA_DIR, "crypto_info.csv")
-    df = pd.read_csv(info_path)
+    # Lecture des données brutes
+    df = read_raw_data("crypto_info")
     
     # Préparation des données
-    df_insert = df[["id", "symbol", "name"]].copy()
-    df_insert.columns = ["crypto_id", "symbol", "name"]
+    # (clé entière crypto_pk attribuée ici, référencée par price_history et metrics)
+    df_insert = df[["id", "symbol", "name"]].rename(columns={"id": "crypto_id"})
+    df_insert.insert(0, "crypto_pk", np.arange(len(df_insert), dtype=np.int32))
     
     # Insertion dans la base
-    df_insert.to_sql("cryptocurrencies", conn, if_exists="append", index=False)
+    bulk_insert(conn, INSERT_CRYPTO,
+                df_insert[CRYPTO_COLUMNS].itertuples(index=False, name=None))
     
     print(f"✓ {len(df_insert)} cryptomonnaies importées")
     print(f"  Exemples: {', '.join(df_insert['symbol'].head(5).tolist())}")
@@ -66,94 +264,312 @@ def import_cryptocurrencies(conn):
     return df
 
 
-def import_price_history(conn):
-    """Importe l'historique des prix"""
+def drop_duplicates_last(df):
+    """
+    Supprime les doublons (crypto_pk, date) en gardant la dernière occurrence
+    
+    Chaque couple est packé dans une clé int64 (crypto_pk << 20 | jour),
+    triée de façon stable : la dernière ligne de chaque clé est conservée.
+    Le résultat est trié par (crypto_pk, date).
+    
+    Args:
+        df (pd.DataFrame): Données avec les colonnes crypto_pk et date (datetime64)
+    
+    Returns:
+        pd.DataFrame: Données dédoublonnées
+    """
+    codes = df["crypto_pk"].to_numpy(dtype=np.int64)
+    days = df["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    key = (codes << 20) | days
+    
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    is_last = np.append(sorted_key[1:] != sorted_key[:-1], True)
+    
+    return df.iloc[order[is_last]]
+
+
+def stage_price_csv():
+    """
+    Charge le CSV de prix dans la table price_history_stage via la CLI sqlite3
+    
+    Le CSV est chargé tel quel par la commande .import (code C de SQLite,
+    aucun objet Python par cellule). La CLI écrit par sa propre connexion :
+    à appeler avant l'ouverture de la transaction de chargement. Comme
+    read_raw_data, le Parquet reste prioritaire : s'il existe, le CSV
+    (potentiellement périmé) n'est pas utilisé.
+    
+    Returns:
+        bool: True si la table de staging a été remplie
+    """
+    csv_path = os.path.join(RAW_DATA_DIR, "price_history.csv")
+    if not (CSV_FAST_IMPORT and os.path.exists(csv_path)):
+        return False
+    if os.path.exists(os.path.join(RAW_DATA_DIR, "price_history.parquet")):
+        print("  ⚠ price_history.parquet présent, import des prix via pandas (Parquet prioritaire)")
+        return False
+    if not SQLITE3_CLI:
+        print("  ⚠ CLI sqlite3 introuvable, import des prix via pandas")
+        return False
+    
+    subprocess.run(
+        [SQLITE3_CLI, DB_PATH],
+        input=f'.mode csv\n.import "{csv_path}" price_history_stage\n',
+        text=True, check=True,
+    )
+    return True
+
+
+def warn_unknown_cryptos(unknown, n_rows):
+    """Signale les lignes d'historique ignorées faute de crypto dans la table"""
+    print(f"  ⚠ {n_rows} lignes d'historique ignorées pour des cryptos absentes "
+          f"de la table: {', '.join(unknown)}")
+
+
+def import_price_history_stage(conn):
+    """Convertit et dédoublonne en SQL la table price_history_stage vers price_history"""
+    # Lignes écartées par la jointure sur cryptocurrencies
+    unknown = conn.execute("""
+        SELECT crypto_id, COUNT(*)
+        FROM price_history_stage
+        WHERE crypto_id NOT IN (SELECT crypto_id FROM cryptocurrencies)
+        GROUP BY crypto_id
+        ORDER BY crypto_id
+    """).fetchall()
+    if unknown:
+        warn_unknown_cryptos([crypto_id for crypto_id, _ in unknown],
+                             sum(count for _, count in unknown))
+    
+    n_rows = conn.execute(STAGE_TO_PRICE_SQL).rowcount
+    conn.execute("DROP TABLE price_history_stage")
+    
+    min_date, max_date = conn.execute(
+        "SELECT MIN(date), MAX(date) FROM price_history"
+    ).fetchone()
+    print(f"✓ {n_rows} lignes de prix importées (sqlite3 .import)")
+    print(f"  Période: {min_date} → {max_date}")
+
+
+def import_price_history(conn, staged=False):
+    """
+    Importe l'historique des prix
+    
+    Args:
+        conn: Connexion à la base
+        staged (bool): Le CSV a déjà été chargé par stage_price_csv()
+    """
     print("\n" + "-"*60)
     print(" IMPORT DE L'HISTORIQUE DES PRIX")
     print("-"*60 + "\n")
     
-    # Lecture du CSV
-    history_path = os.path.join(RAW_DATA_DIR, "price_history.csv")
-    df = pd.read_csv(history_path)
+    # Chemin rapide : CSV déjà importé par SQLite, conversion en SQL
+    if staged:
+        return import_price_history_stage(conn)
     
-    # Préparation des données
-    df_insert = df[["crypto_id", "date", "price", "market_cap", "volume"]].copy()
-    df_insert.columns = ["crypto_id", "date", "price_usd", "market_cap", "total_volume"]
+    # Lecture des données brutes
+    df = read_raw_data("price_history")
     
-    # Conversion des types
-    df_insert["date"] = pd.to_datetime(df_insert["date"]).dt.date
+    # Identifiant CoinGecko -> clé entière crypto_pk (int32)
+    mapping = dict(conn.execute("SELECT crypto_id, crypto_pk FROM cryptocurrencies").fetchall())
+    crypto_pk = df["crypto_id"].map(mapping)
+    known = crypto_pk.notna()
+    if not known.all():
+        warn_unknown_cryptos(sorted(set(df.loc[~known, "crypto_id"])), int((~known).sum()))
+        df = df[known]
+    df = df.assign(crypto_pk=crypto_pk[known].astype(np.int32))
+    
+    # Préparation des données
+    # (date gardée en datetime64, convertie en 'YYYY-MM-DD' par l'adaptateur à l'insertion)
+    df_insert = df[["crypto_pk", "date", "price", "market_cap", "volume"]].rename(
+        columns={"price": "price_usd", "volume": "total_volume"}
+    )
     
-    #Suppression des doublons (garde la dernière valeur)
-    df_insert = df_insert.drop_duplicates(subset=["crypto_id", "date"], keep="last")
+    # Suppression des doublons (garde la dernière valeur), triée par (crypto_pk, date)
+    df_insert = drop_duplicates_last(df_insert)
     
     print(f"  Lignes après nettoyage des doublons: {len(df_insert)}")
     
     # Insertion dans la base
-    df_insert.to_sql("price_history", conn, if_exists="append", index=False)
+    # Colonnes NumPy zippées : les dates arrivent en np.datetime64, sans objet Timestamp
+    rows = zip(*(df_insert[col].to_numpy() for col in PRICE_COLUMNS))
+    bulk_insert(conn, INSERT_PRICE, rows)
     
     print(f"✓ {len(df_insert)} lignes de prix importées")
-    print(f"  Période: {df_insert['date'].min()} → {df_insert['date'].max()}")
+    print(f"  Période: {df_insert['date'].min():%Y-%m-%d} → {df_insert['date'].max():%Y-%m-%d}")
     
     return df_insert
 
+
+class RollingStd:
+    """
+    Écart-type (ddof=1) utilisable comme fonction de fenêtrage SQLite
+    
+    Moyenne et somme des carrés des écarts mises à jour à l'entrée (step)
+    et à la sortie (inverse) de chaque valeur du cadre : O(1) par ligne.
+    Les NULL sont ignorés ; un infini dans le cadre donne NULL sans entrer
+    dans les accumulateurs (comme rolling_std_into).
+    """
+    
+    def __init__(self):
+        self.n = 0
+        self.ninf = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+    
+    def step(self, value):
+        if value is None:
+            return
+        if math.isinf(value):
+            self.ninf += 1
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.ssqdm += delta * (value - self.mean)
+    
+    def inverse(self, value):
+        if value is None:
+            return
+        if math.isinf(value):
+            self.ninf -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.n
+        self.ssqdm -= delta * (value - self.mean)
+    
+    def value(self):
+        if self.ninf > 0 or self.n < 2:
+            return None
+        return (max(self.ssqdm, 0.0) / (self.n - 1)) ** 0.5
+    
+    def finalize(self):
+        return self.value()
+
+
+def calculate_metrics_sql(conn):
+    """
+    Calcule les métriques dans SQLite en une seule requête INSERT ... SELECT
+    
+    Les données ne quittent pas la base : rendements via LAG(), volatilités
+    via la fonction de fenêtrage stddev() (RollingStd).
+    
+    Returns:
+        int: Nombre de métriques insérées
+    """
+    conn.create_window_function("stddev", 1, RollingStd)
+    return conn.execute(METRICS_SQL).rowcount
+
+
 def calculate_metrics(conn):
     """Calcule et importe les métriques (rendements, volatilité)"""
     print("\n" + "-"*60)
     print(" CALCUL DES MÉTRIQUES")
     print("-"*60 + "\n")
     
-    # Lecture des prix depuis la base
-    df = pd.read_sql_query("""
-        SELECT crypto_id, date, price_usd, total_volume
+    if METRICS_IN_SQL:
+        if hasattr(conn, "create_window_function"):
+            n_metrics = calculate_metrics_sql(conn)
+            print(f"✓ {n_metrics} métriques calculées et importées (fonctions de fenêtrage SQL)")
+            print(f"  Métriques: daily_return, volatility_7d, volatility_30d, volume_change_24h")
+            return
+        print("  ⚠ create_window_function indisponible (Python 3.11+ requis), calcul via NumPy")
+    
+    # Lecture unique triée par (crypto, date) : chaque crypto forme une tranche contiguë
+    # (curseur brut vers tableaux NumPy, sans DataFrame intermédiaire ;
+    # float32 pour les noyaux, la précision float64 n'est pas nécessaire aux métriques)
+    rows = conn.execute("""
+        SELECT crypto_pk, date, price_usd, total_volume
         FROM price_history
-        ORDER BY crypto_id, date
-    """, conn)
-    
-    df["date"] = pd.to_datetime(df["date"])
-    
-    metrics_list = []
-    
-    # Calcul des métriques par crypto
-    for crypto_id in df["crypto_id"].unique():
-        df_crypto = df[df["crypto_id"] == crypto_id].copy()
-        df_crypto = df_crypto.sort_values("date")
-        
-        # Calcul du rendement quotidien (en %)
-        df_crypto["daily_return"] = df_crypto["price_usd"].pct_change() * 100
-        
-        # Calcul de la volatilité sur 7 jours (écart-type mobile)
-        df_crypto["volatility_7d"] = df_crypto["daily_return"].rolling(window=7).std()
-        
-        # Calcul de la volatilité sur 30 jours
-        df_crypto["volatility_30d"] = df_crypto["daily_return"].rolling(window=30).std()
-        
-        # Changement de volume sur 24h
-        df_crypto["volume_change_24h"] = df_crypto["total_volume"].pct_change() * 100
-        
-        # Ajout des données dans la liste
-        for idx, row in df_crypto.iterrows():
-            if pd.notna(row["daily_return"]):  # Évite les NaN
-                metrics_list.append({
-                    "crypto_id": crypto_id,
-                    "date": row["date"].date(),
-                    "daily_return": row["daily_return"],
-                    "volatility_7d": row["volatility_7d"],
-                    "volatility_30d": row["volatility_30d"],
-                    "volume_change_24h": row["volume_change_24h"]
-                })
-    
-    # Conversion en DataFrame et insertion
-    df_metrics = pd.DataFrame(metrics_list)
-    
-    # Remplacement des NaN par None pour SQLite
-    df_metrics = df_metrics.where(pd.notna(df_metrics), None)
-    
-    df_metrics.to_sql("metrics", conn, if_exists="append", index=False)
-    
-    print(f"✓ {len(df_metrics)} métriques calculées et importées")
+        ORDER BY crypto_pk, date
+    """).fetchall()
+    n = len(rows)
+    crypto_pk, dates, prices, volumes = zip(*rows) if rows else ((), (), (), ())
+    crypto_pk = np.fromiter(crypto_pk, dtype=np.int32, count=n)
+    prices = np.fromiter(prices, dtype=np.float32, count=n)
+    volumes = np.fromiter(volumes, dtype=np.float32, count=n)
+    
+    # crypto_pk vaut 0..k-1 : il sert directement de code de groupe
+    starts, ends = group_bounds(crypto_pk)
+    
+    # Tableaux de sortie alloués une fois, remplis en parallèle (une crypto par thread)
+    returns = np.empty(n, dtype=np.float32)
+    volatility_7d = np.empty(n, dtype=np.float32)
+    volatility_30d = np.empty(n, dtype=np.float32)
+    volume_change = np.empty(n, dtype=np.float32)
+    all_metrics(prices, volumes, starts, ends,
+                returns, volatility_7d, volatility_30d, volume_change)
+    
+    # Évite les NaN du premier jour ; les autres NaN deviennent NULL à l'insertion
+    keep = ~np.isnan(returns)
+    n_metrics = int(np.count_nonzero(keep))
+    
+    # Colonnes finales allouées à leur taille exacte et remplies en une passe
+    # (retour en float64 pour l'écriture : sqlite3 n'accepte pas les float32)
+    out_columns = []
+    for col in (returns, volatility_7d, volatility_30d, volume_change):
+        out = np.empty(n_metrics, dtype=np.float64)
+        compact_into(keep, col, out)
+        out_columns.append(out)
+    
+    metrics_rows = zip(crypto_pk[keep], compress(dates, keep), *out_columns)
+    bulk_insert(conn, INSERT_METRICS, iter_rows_nan_to_none(metrics_rows))
+    
+    print(f"✓ {n_metrics} métriques calculées et importées")
     print(f"  Métriques: daily_return, volatility_7d, volatility_30d, volume_change_24h")
 
 
+def create_indexes(conn):
+    """Crée les index secondaires une fois les données chargées, puis ANALYZE"""
+    _, index_ddl = read_schema()
+    conn.executescript(index_ddl)
+    conn.execute("ANALYZE")
+    
+    print("\n✓ Index créés et statistiques mises à jour (ANALYZE)")
+
+
+def estimate_row_counts(conn, tables):
+    """
+    Nombre de lignes par table sans parcourir les tables
+    
+    Lit le nombre de lignes enregistré par ANALYZE dans sqlite_stat1
+    (premier entier du champ stat) ; à défaut, MAX(rowid) via le B-tree.
+    Une table a une ligne par index : on garde le maximum, les index
+    partiels ne comptant que les lignes qu'ils couvrent.
+    
+    Args:
+        conn: Connexion à la base
+        tables (list): Noms des tables
+    
+    Returns:
+        dict: {table: nombre de lignes}
+    """
+    placeholders = ",".join("?" * len(tables))
+    try:
+        stats = dict(conn.execute(f"""
+            SELECT tbl, MAX(CAST(stat AS INTEGER))
+            FROM sqlite_stat1
+            WHERE tbl IN ({placeholders})
+            GROUP BY tbl
+        """, tables).fetchall())
+    except sqlite3.OperationalError:
+        # sqlite_stat1 n'existe pas tant qu'ANALYZE n'a pas été exécuté
+        stats = {}
+    
+    counts = {}
+    for table in tables:
+        if table in stats:
+            counts[table] = stats[table]
+        else:
+            max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0]
+            counts[table] = max_rowid or 0
+    return counts
+
+
 def verify_data(conn):
     """Vérifie l'intégrité des données importées"""
     print("\n" + "-"*60)
@@ -162,23 +578,19 @@ def verify_data(conn):
     
     cursor = conn.cursor()
     
-    # Compte des enregistrements
-    counts = {
-        "cryptocurrencies": cursor.execute("SELECT COUNT(*) FROM cryptocurrencies").fetchone()[0],
-        "price_history": cursor.execute("SELECT COUNT(*) FROM price_history").fetchone()[0],
-        "metrics": cursor.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
-    }
+    # Compte des enregistrements (statistiques ANALYZE, sans COUNT(*))
+    counts = estimate_row_counts(conn, ["cryptocurrencies", "price_history", "metrics"])
     
     for table, count in counts.items():
         print(f"  {table}: {count:,} lignes")
     
     # Dates disponibles
-    date_range = cursor.execute("""
+    min_date, max_date = cursor.execute("""
         SELECT MIN(date) as min_date, MAX(date) as max_date 
         FROM price_history
     """).fetchone()
     
-    print(f"\n  Période de données: {date_range[0]} → {date_range[1]}")
+    print(f"\n  Période de données: {min_date} → {max_date}")
     
     # Exemple de données via la vue
     print("\n  Aperçu via vw_price_analysis:")
@@ -198,7 +610,9 @@ def run_sample_queries(conn):
     print("-"*60 + "\n")
     
     # Requête 1: Top 5 cryptos par market cap
+    # (date max calculée une fois, puis lecture de l'index idx_ph_date_mcap)
     print("Top 5 cryptos par market cap actuel:")
+    max_date = conn.execute("SELECT MAX(date) FROM price_history").fetchone()[0]
     df = pd.read_sql_query("""
         SELECT 
             c.symbol,
@@ -206,11 +620,11 @@ def run_sample_queries(conn):
             ROUND(ph.market_cap / 1000000000, 2) as market_cap_billions,
             ROUND(ph.price_usd, 2) as price
         FROM price_history ph
-        JOIN cryptocurrencies c ON ph.crypto_id = c.crypto_id
-        WHERE ph.date = (SELECT MAX(date) FROM price_history)
+        JOIN cryptocurrencies c ON ph.crypto_pk = c.crypto_pk
+        WHERE ph.date = :max_date
         ORDER BY ph.market_cap DESC
         LIMIT 5
-    """, conn)
+    """, conn, params={"max_date": max_date})
     print(df.to_string(index=False))
     
     # Requête 2: Crypto la plus volatile
@@ -220,7 +634,7 @@ def run_sample_queries(conn):
             c.symbol,
             ROUND(AVG(m.volatility_30d), 2) as avg_volatility
         FROM metrics m
-        JOIN cryptocurrencies c ON m.crypto_id = c.crypto_id
+        JOIN cryptocurrencies c ON m.crypto_pk = c.crypto_pk
         WHERE m.volatility_30d IS NOT NULL
         GROUP BY c.symbol
         ORDER BY avg_volatility DESC
@@ -236,11 +650,22 @@ def main():
     try:
         # Création de la base
         conn = create_database()
+        staged = stage_price_csv()
+        
+        # Import des données et calcul des métriques dans une seule transaction
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            import_cryptocurrencies(conn)
+            import_price_history(conn, staged)
+            calculate_metrics(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
         
-        # Import des données
-        import_cryptocurrencies(conn)
-        import_price_history(conn)
-        calculate_metrics(conn)
+        # Index et statistiques une fois les données validées
+        create_indexes(conn)
+        conn.executescript(FINAL_PRAGMAS)
         
         # Vérifications
         verify_data(conn)
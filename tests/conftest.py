@@ -0,0 +1,9 @@
+"""
+Configuration pytest : les scripts de src/ s'importent entre eux par leur nom
+(ex: `from _kernels import ...`), on ajoute donc src/ au chemin d'import
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
@@ -0,0 +1,174 @@
+"""
+Tests de parité des noyaux numériques avec pandas
+(rendements, volatilités mobiles, compaction, dédoublonnage)
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from _kernels import all_metrics, compact_into, group_bounds, pct_change_pct, rolling_std
+import database
+from database import RollingStd, drop_duplicates_last
+
+
+def series_with_gaps(n, seed=0):
+    """Série de rendements aléatoires avec des trous NaN (isolés et en rafale)"""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 3.0, n)
+    x[rng.choice(n, size=n // 10, replace=False)] = np.nan
+    x[n // 2:n // 2 + 40] = np.nan  # fenêtre entièrement vide : remise à zéro (nobs == 0)
+    return x
+
+
+def pandas_pct_change(x):
+    """Référence pandas : pct_change() * 100, sans remplissage des NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.Series(x).pct_change(fill_method=None).to_numpy() * 100
+
+
+@pytest.mark.parametrize("w", [7, 30])
+@pytest.mark.parametrize("n", [0, 1, 5, 29, 200])
+def test_rolling_std_matches_pandas(n, w):
+    x = series_with_gaps(n) if n >= 100 else np.random.default_rng(n).normal(size=n)
+    expected = pd.Series(x).rolling(w).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(x, w), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_rolling_std_float32_input_keeps_float64_accumulators():
+    x = series_with_gaps(300, seed=1)
+    expected = pd.Series(x.astype(np.float32).astype(np.float64)).rolling(7).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(x.astype(np.float32), 7), expected, rtol=1e-12)
+
+
+def test_pct_change_matches_pandas_with_zero_and_nan():
+    x = np.array([10.0, 11.0, 0.0, 0.0, 5.0, np.nan, 4.0, 4.4])
+    out = np.empty_like(x)
+    pct_change_pct(x, out)
+    np.testing.assert_allclose(out, pandas_pct_change(x), rtol=1e-12)
+
+
+def test_pct_change_empty():
+    out = np.empty(0)
+    pct_change_pct(np.empty(0), out)
+    assert out.size == 0
+
+
+def test_compact_into_masks_and_widens():
+    src = np.array([1.5, np.nan, 2.25, 3.0, np.nan], dtype=np.float32)
+    keep = ~np.isnan(src)
+    dst = np.empty(np.count_nonzero(keep), dtype=np.float64)
+    compact_into(keep, src, dst)
+    np.testing.assert_array_equal(dst, src[keep].astype(np.float64))
+
+
+def test_all_metrics_matches_pandas_groupby():
+    rng = np.random.default_rng(42)
+    # Groupe 1 vide, groupe 3 plus court que les fenêtres, prix nul dans le groupe 0
+    sizes = {0: 120, 2: 60, 3: 4}
+    codes = np.concatenate([np.full(n, g) for g, n in sizes.items()])
+    prices = rng.uniform(1.0, 100.0, len(codes))
+    prices[10] = 0.0
+    volumes = rng.uniform(1e6, 1e9, len(codes))
+
+    starts, ends = group_bounds(codes)
+    assert starts[1] == ends[1]
+
+    out = [np.empty(len(codes)) for _ in range(4)]
+    all_metrics(prices, volumes, starts, ends, *out)
+    returns, vol7, vol30, volume_change = out
+
+    df = pd.DataFrame({"g": codes, "price": prices, "volume": volumes})
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exp_returns = df.groupby("g")["price"].pct_change(fill_method=None) * 100
+        exp_volume = df.groupby("g")["volume"].pct_change(fill_method=None) * 100
+    assert np.isinf(exp_returns).any()
+
+    np.testing.assert_allclose(returns, exp_returns.to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(volume_change, exp_volume.to_numpy(), rtol=1e-12)
+    for w, result in ((7, vol7), (30, vol30)):
+        # Référence : rolling(w).std() par groupe, NaN pour les fenêtres contenant l'infini
+        expected = exp_returns.groupby(codes).rolling(w).std().to_numpy()
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.skipif(not hasattr(sqlite3.Connection, "create_window_function"),
+                    reason="create_window_function nécessite Python 3.11+")
+@pytest.mark.parametrize("w", [7, 30])
+def test_rolling_std_window_function_matches_pandas(w):
+    x = series_with_gaps(200, seed=3)
+    conn = sqlite3.connect(":memory:")
+    conn.create_window_function("stddev", 1, RollingStd)
+    conn.execute("CREATE TABLE t (i INTEGER PRIMARY KEY, x REAL)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)",
+                     [(i, None if np.isnan(v) else float(v)) for i, v in enumerate(x)])
+    rows = conn.execute(f"""
+        SELECT stddev(x) OVER (ORDER BY i ROWS {w - 1} PRECEDING) FROM t ORDER BY i
+    """).fetchall()
+    result = np.array([np.nan if r[0] is None else r[0] for r in rows])
+
+    # RollingStd rend une valeur dès 2 observations (la garde COUNT = w est dans METRICS_SQL)
+    expected = pd.Series(x).rolling(w, min_periods=2).std().to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+
+def load_and_compute_metrics(monkeypatch, in_sql):
+    """Base en mémoire avec prix nuls, métriques calculées par le chemin choisi"""
+    monkeypatch.setattr(database, "SCHEMA_PATH", os.path.join(
+        os.path.dirname(__file__), os.pardir, "sql", "schema.sql"))
+    monkeypatch.setattr(database, "METRICS_IN_SQL", in_sql)
+
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    table_ddl, _ = database.read_schema()
+    conn.executescript(table_ddl)
+    conn.executemany(database.INSERT_CRYPTO, [(0, "a", "A", "A"), (1, "b", "B", "B")])
+
+    # Prix et volumes entiers (exacts en float32) ; jours 10 (x / 0) et 21 (0 / 0) à prix nul
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2025-01-01", periods=45).strftime("%Y-%m-%d")
+    rows = []
+    for pk in (0, 1):
+        prices = rng.integers(50, 150, len(dates)).astype(float)
+        volumes = rng.integers(1_000, 9_000, len(dates)).astype(float)
+        if pk == 0:
+            prices[[9, 20, 21]] = 0.0
+            volumes[30] = 0.0
+        rows += [(pk, d, p, p * 10, v) for d, p, v in zip(dates, prices, volumes)]
+    conn.executemany(database.INSERT_PRICE, rows)
+
+    database.calculate_metrics(conn)
+    return conn.execute("""
+        SELECT crypto_pk, date, daily_return, volatility_7d, volatility_30d, volume_change_24h
+        FROM metrics ORDER BY crypto_pk, date
+    """).fetchall()
+
+
+@pytest.mark.skipif(not hasattr(sqlite3.Connection, "create_window_function"),
+                    reason="create_window_function nécessite Python 3.11+")
+def test_metrics_sql_matches_kernel_with_zero_prices(monkeypatch):
+    kernel = load_and_compute_metrics(monkeypatch, in_sql=False)
+    sql = load_and_compute_metrics(monkeypatch, in_sql=True)
+
+    assert [r[:2] for r in sql] == [r[:2] for r in kernel]
+    to_array = lambda rows: np.array([[np.nan if v is None else v for v in r[2:]] for r in rows])
+    values_kernel, values_sql = to_array(kernel), to_array(sql)
+    assert np.isinf(values_kernel[:, 0]).any() and np.isinf(values_kernel[:, 3]).any()
+    # Le noyau travaille sur des sorties float32 : écart relatif de l'ordre de 1e-7
+    np.testing.assert_allclose(values_sql, values_kernel, rtol=1e-6)
+
+
+def test_drop_duplicates_last_matches_pandas():
+    df = pd.DataFrame({
+        "crypto_pk": np.array([2, 0, 1, 0, 2, 0, 1, 2], dtype=np.int32),
+        "date": pd.to_datetime(["2025-01-03", "2025-01-02", "2025-01-01", "2025-01-02",
+                                "2025-01-03", "2025-01-01", "2025-01-01", "2025-01-01"]),
+        "price_usd": np.arange(8, dtype=np.float64),
+    })
+    expected = (df.drop_duplicates(["crypto_pk", "date"], keep="last")
+                  .sort_values(["crypto_pk", "date"]))
+    result = drop_duplicates_last(df)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True),
+                                  expected.reset_index(drop=True))